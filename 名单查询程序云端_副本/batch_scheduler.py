@@ -0,0 +1,82 @@
+"""
+多班批量核查调度：一个任务 = (班级名单, 完成情况文本)
+
+- 极速匹配是纯 CPU 计算，按班级分片丢进进程池，吞吐随核数增长
+- AI 提取是等模型返回，放进有界线程池；每次调用模型前先拿全局模型槽位，
+  所以不管多少会话同时批量核查，同时在跑的模型请求都不超过槽位数
+- 结果按完成顺序逐个产出，页面可以边收边刷新汇总看板
+- 子进程崩溃会让整个进程池失效：受影响的班级各自报错，并通知调用方重建进程池
+"""
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+from matcher import match_names_turbo
+
+_NAME_SPLIT_RE = re.compile(r"[\s,，、;；]+")
+
+
+def split_names(text):
+    """把 "张三、李四 王五" 这类名单文本拆成去重后的名字元组"""
+    return tuple(dict.fromkeys(n for n in _NAME_SPLIT_RE.split(text or "") if n))
+
+
+def turbo_job(targets, text):
+    """在子进程里执行的极速匹配，参数和返回值都可以被 pickle"""
+    start = time.perf_counter()
+    done = match_names_turbo(targets, text)
+    return done, time.perf_counter() - start
+
+
+def _ai_job(targets, text, ai_extract, model_slots):
+    start = time.perf_counter()
+    with model_slots:
+        names = ai_extract(text)
+    return set(targets) & set(names), time.perf_counter() - start
+
+
+def _result(job, done=None, elapsed=0.0, error=None):
+    return {"name": job["name"], "targets": job["targets"], "done": done or set(), "elapsed": elapsed, "error": error}
+
+
+def run_jobs(jobs, process_pool, ai_extract=None, model_slots=None, ai_workers=4, on_pool_broken=None):
+    """
+    jobs: [{"name": 班级, "targets": 名字元组, "text": 完成情况, "use_ai": bool}]
+    按完成先后 yield {"name", "targets", "done", "elapsed", "error"}
+    发现进程池已失效时调用一次 on_pool_broken()，由调用方丢掉旧池、下次重建
+    """
+    futures, failed = {}, []
+    broken = False
+
+    def pool_broken(e):
+        nonlocal broken
+        if not broken:
+            broken = True
+            if on_pool_broken:
+                on_pool_broken()
+        return f"进程池异常退出，已重建，请重新核查：{e}"
+
+    with ThreadPoolExecutor(max_workers=ai_workers) as ai_pool:
+        for job in jobs:
+            if job["use_ai"]:
+                fut = ai_pool.submit(_ai_job, job["targets"], job["text"], ai_extract, model_slots)
+            else:
+                try:
+                    fut = process_pool.submit(turbo_job, job["targets"], job["text"])
+                except BrokenProcessPool as e:
+                    failed.append(_result(job, error=pool_broken(e)))
+                    continue
+            futures[fut] = job
+
+        yield from failed
+        for fut in as_completed(futures):
+            job = futures[fut]
+            try:
+                done, elapsed = fut.result()
+            except BrokenProcessPool as e:
+                yield _result(job, error=pool_broken(e))
+            except Exception as e:
+                yield _result(job, error=str(e))
+            else:
+                yield _result(job, done, elapsed)
@@ -0,0 +1,185 @@
+"""
+紧凑名单：每个名字一个整数编号，全部名字拼成一整块 UTF-8 字节，分组用位图表示
+
+- 分组、完成、未完成都是位图 (Python int，第 i 位对应编号 i)，
+  筛选就是位运算，如 未完成 = 应到 & ~已完成，不再复制名字列表和集合
+- 名字表只有「字节块 + 偏移数组 + 按名字排序的编号数组」，名字用到时才解码；
+  名字 -> 编号在排序数组上二分查找，不建 str -> int 字典
+- 可以存成二进制快照，mmap 只读打开，多个进程共享同一份物理内存
+
+快照格式 (小端)：
+    magic b"RSTR" | 版本 u16 | 保留 u16 | 名字数 n u32 | 源文件 mtime_ns u64 | 源文件 size u64
+    偏移表 (n + 1) x u32
+    排序表 n x u32 (按名字的 UTF-8 字节序排列的编号)
+    名字字节块
+    团员位图 ceil(n / 8) 字节 | 群众位图 ceil(n / 8) 字节
+"""
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from bisect import bisect_left
+from itertools import compress
+
+from matcher import turbo_hits
+
+MAGIC = b"RSTR"
+VERSION = 2
+_HEADER = struct.Struct("<4sHHIQQ")
+
+
+# 每个字节值里置位的位号，如 0b101 -> (0, 2)
+_BYTE_BITS = [tuple(j for j in range(8) if b >> j & 1) for b in range(256)]
+
+
+def _to_bits(ids, size=0):
+    """编号 -> 位图。先在 bytearray 里置位再一次性转 int；
+    直接 bits |= 1 << i 每次都会新建一个大整数，n 个编号就是 O(n^2)"""
+    buf = bytearray((size + 7) // 8)
+    for i in ids:
+        pos = i >> 3
+        if pos >= len(buf):
+            buf.extend(bytes(pos + 1 - len(buf)))
+        buf[pos] |= 1 << (i & 7)
+    return int.from_bytes(buf, "little")
+
+
+class CompactRoster:
+    """只读名单表；group_a / group_b / all_bits 都是位图"""
+
+    def __init__(self, blob, offsets, order, group_a, group_b, stamp=None):
+        self._blob = blob          # bytes 或 mmap 上的 memoryview
+        self._offsets = offsets    # array("I") 或 memoryview.cast("I")
+        self._order = order        # 按名字排序的编号，同上
+        self.size = len(offsets) - 1
+        self.group_a = group_a
+        self.group_b = group_b
+        self.all_bits = group_a | group_b
+        self.stamp = stamp         # 对应源 JSON 的 (mtime_ns, size)
+
+    @classmethod
+    def build(cls, group_a, group_b, stamp=None):
+        """从两组名字建表，重复的名字共用一个编号"""
+        names = list(dict.fromkeys([*group_a, *group_b]))
+        index = {name: i for i, name in enumerate(names)}
+        offsets, parts, pos = array("I", [0]), [], 0
+        for name in names:
+            data = name.encode("utf-8")
+            parts.append(data)
+            pos += len(data)
+            offsets.append(pos)
+        # str 按码位比较，和 UTF-8 字节序一致
+        order = array("I", sorted(range(len(names)), key=names.__getitem__))
+        return cls(
+            b"".join(parts), offsets, order,
+            _to_bits((index[n] for n in group_a), len(names)),
+            _to_bits((index[n] for n in group_b), len(names)),
+            stamp,
+        )
+
+    # ---------- 查询 ----------
+    def name(self, i):
+        return str(self._blob[self._offsets[i]:self._offsets[i + 1]], "utf-8")
+
+    def _name_bytes(self, i):
+        return bytes(self._blob[self._offsets[i]:self._offsets[i + 1]])
+
+    def find(self, name):
+        """名字 -> 编号，不在名单里返回 None；在排序表上二分，O(log n)"""
+        key = name.encode("utf-8")
+        pos = bisect_left(self._order, key, key=self._name_bytes)
+        if pos < self.size and self._name_bytes(self._order[pos]) == key:
+            return self._order[pos]
+        return None
+
+    def ids(self, bits):
+        """按编号从小到大列出位图里置位的编号 (转成字节后逐字节查表，不在大整数上反复做位运算)"""
+        for pos, byte in enumerate(bits.to_bytes((bits.bit_length() + 7) // 8, "little")):
+            if byte:
+                base = pos << 3
+                for j in _BYTE_BITS[byte]:
+                    yield base + j
+
+    def names_of(self, bits):
+        return [self.name(i) for i in self.ids(bits)]
+
+    @staticmethod
+    def count(bits):
+        return bits.bit_count()
+
+    def mask(self, names):
+        """把一组名字转成位图，不在名单里的名字忽略"""
+        ids = (self.find(n) for n in names)
+        return _to_bits((i for i in ids if i is not None), self.size)
+
+    def match_turbo(self, bits, raw_text):
+        """极速匹配 (规则见 matcher.turbo_hits)，只检查 bits 里的人，返回已完成位图"""
+        ids = list(self.ids(bits))
+        hits = turbo_hits((self.name(i) for i in ids), raw_text)
+        return _to_bits(compress(ids, hits), self.size)
+
+    # ---------- 二进制快照 ----------
+    def save_snapshot(self, path):
+        """写临时文件再原子替换"""
+        nbytes = (self.size + 7) // 8
+        offsets = array("I", self._offsets)
+        order = array("I", self._order)
+        if sys.byteorder != "little":
+            offsets.byteswap()
+            order.byteswap()
+        mtime_ns, size = self.stamp or (0, 0)
+        data = b"".join([
+            _HEADER.pack(MAGIC, VERSION, 0, self.size, mtime_ns, size),
+            offsets.tobytes(),
+            order.tobytes(),
+            bytes(self._blob),
+            self.group_a.to_bytes(nbytes, "little"),
+            self.group_b.to_bytes(nbytes, "little"),
+        ])
+        fd, tmp_path = tempfile.mkstemp(prefix=".roster.", suffix=".tmp", dir=os.path.dirname(os.path.abspath(path)))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except:
+            os.unlink(tmp_path)
+            raise
+
+    @classmethod
+    def open_snapshot(cls, path, stamp=None):
+        """mmap 只读打开快照；格式不对或与 stamp 对应的源文件不一致时返回 None"""
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size < _HEADER.size:
+                return None
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, n, mtime_ns, size = _HEADER.unpack_from(mm, 0)
+        if magic != MAGIC or version != VERSION or (stamp is not None and (mtime_ns, size) != tuple(stamp)):
+            mm.close()
+            return None
+
+        nbytes = (n + 7) // 8
+        if len(mm) < _HEADER.size + 4 * (2 * n + 1) + 2 * nbytes:
+            mm.close()
+            return None
+
+        view = memoryview(mm)
+        pos = _HEADER.size
+        raw_offsets = view[pos:pos + 4 * (n + 1)]
+        pos += 4 * (n + 1)
+        raw_order = view[pos:pos + 4 * n]
+        pos += 4 * n
+        if sys.byteorder == "little":
+            offsets, order = raw_offsets.cast("I"), raw_order.cast("I")
+        else:
+            offsets, order = array("I", raw_offsets.tobytes()), array("I", raw_order.tobytes())
+            offsets.byteswap()
+            order.byteswap()
+        if len(mm) != pos + offsets[n] + 2 * nbytes:
+            return None  # 文件被截断；memoryview 还引用着 mmap，交给垃圾回收关闭
+        blob = view[pos:pos + offsets[n]]
+        pos += offsets[n]
+        group_a = int.from_bytes(view[pos:pos + nbytes], "little")
+        group_b = int.from_bytes(view[pos + nbytes:pos + 2 * nbytes], "little")
+        return cls(blob, offsets, order, group_a, group_b, (mtime_ns, size))
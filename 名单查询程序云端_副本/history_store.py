@@ -0,0 +1,188 @@
+"""
+核查历史库 (SQLite)：记录每次活动核查结果，并增量维护每人的累计统计
+
+- campaigns：每个 (活动, 范围) 一行；同名活动换了范围 (如全班 / 仅团员) 算不同的两次核查
+- campaign_records：每人每个活动一行，同一活动同一范围重新核查时覆盖
+- student_summary：每人的累计统计 (按活动计)，写入时维护，历史页直接读它，不再全表扫描
+
+新活动走增量 UPSERT；重新核查旧活动时改为按记录重新累计涉及到的人，两条路径结果一致。
+"""
+import sqlite3
+from datetime import datetime
+
+SCHEMA_VERSION = 1
+_CAMPAIGNS_TABLE = """
+    CREATE TABLE IF NOT EXISTS {name} (
+        campaign_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        campaign    TEXT    NOT NULL,
+        scope       TEXT    NOT NULL,
+        checked_at  TEXT    NOT NULL,
+        total_n     INTEGER NOT NULL,
+        done_n      INTEGER NOT NULL,
+        UNIQUE (campaign, scope)
+    );
+"""
+_SCHEMA = _CAMPAIGNS_TABLE.format(name="campaigns") + """
+    CREATE TABLE IF NOT EXISTS campaign_records (
+        campaign_id INTEGER NOT NULL REFERENCES campaigns(campaign_id),
+        name        TEXT    NOT NULL,
+        done        INTEGER NOT NULL,
+        PRIMARY KEY (campaign_id, name)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_records_name ON campaign_records(name, campaign_id);
+    CREATE TABLE IF NOT EXISTS student_summary (
+        name            TEXT    PRIMARY KEY,
+        checks          INTEGER NOT NULL,
+        done            INTEGER NOT NULL,
+        miss_streak     INTEGER NOT NULL,
+        max_miss_streak INTEGER NOT NULL,
+        last_campaign   TEXT    NOT NULL
+    ) WITHOUT ROWID;
+"""
+
+
+def _migrate(conn):
+    """旧库 (版本 0) 的 campaigns 只按活动名唯一，改成按 (活动, 范围) 唯一，数据原样保留"""
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version >= SCHEMA_VERSION:
+        return
+    if version == 0 and conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'campaigns'").fetchone():
+        conn.executescript("BEGIN;" + _CAMPAIGNS_TABLE.format(name="campaigns_v1") + """
+            INSERT INTO campaigns_v1 SELECT campaign_id, campaign, scope, checked_at, total_n, done_n FROM campaigns;
+            DROP TABLE campaigns;
+            ALTER TABLE campaigns_v1 RENAME TO campaigns;
+            COMMIT;
+        """)
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+
+def rebuild_summary(conn, names):
+    """按活动先后重新累计这些人的统计；只在同一活动重新核查时用到"""
+    for name in names:
+        outcomes = conn.execute("""
+            SELECT r.done, c.campaign FROM campaign_records r JOIN campaigns c USING (campaign_id)
+            WHERE r.name = ? ORDER BY r.campaign_id
+        """, (name,)).fetchall()
+        if not outcomes:
+            conn.execute("DELETE FROM student_summary WHERE name = ?", (name,))
+            continue
+        streak = max_streak = 0
+        for done, _ in outcomes:
+            streak = 0 if done else streak + 1
+            max_streak = max(max_streak, streak)
+        conn.execute(
+            "INSERT OR REPLACE INTO student_summary VALUES (?, ?, ?, ?, ?, ?)",
+            (name, len(outcomes), sum(done for done, _ in outcomes), streak, max_streak, outcomes[-1][1]),
+        )
+
+
+class HistoryStore:
+    """一个历史库文件；每次操作单独开关连接，可以在多个会话 / 线程里共用"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def connect(self):
+        """打开历史库，首次使用时建表建索引，旧版本的库顺带升级"""
+        conn = sqlite3.connect(self.path)
+        _migrate(conn)
+        conn.executescript(_SCHEMA)
+        return conn
+
+    def append(self, campaign, scope, target_list, valid_done):
+        """
+        记录一个活动的核查结果：
+        新活动追加一行并增量更新每人统计；
+        同一活动、同一范围再次核查则覆盖每人在这个活动里的结果，换了范围算新的一次核查
+        """
+        checked_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        names = list(dict.fromkeys(target_list))
+        summary = (campaign, scope, checked_at, len(names), sum(1 for n in names if n in valid_done))
+        conn = self.connect()
+        try:
+            with conn:
+                row = conn.execute(
+                    "SELECT campaign_id FROM campaigns WHERE campaign = ? AND scope = ?", (campaign, scope)
+                ).fetchone()
+                if row is None:
+                    cur = conn.execute(
+                        "INSERT INTO campaigns (campaign, scope, checked_at, total_n, done_n) VALUES (?, ?, ?, ?, ?)",
+                        summary,
+                    )
+                    campaign_id = cur.lastrowid
+                else:
+                    campaign_id = row[0]
+                    previous = {n for (n,) in conn.execute("SELECT name FROM campaign_records WHERE campaign_id = ?", (campaign_id,))}
+                    conn.execute(
+                        "UPDATE campaigns SET checked_at = ?, total_n = ?, done_n = ? WHERE campaign_id = ?",
+                        (*summary[2:], campaign_id),
+                    )
+                    conn.execute("DELETE FROM campaign_records WHERE campaign_id = ?", (campaign_id,))
+
+                rows = [(campaign_id, n, int(n in valid_done)) for n in names]
+                conn.executemany("INSERT INTO campaign_records (campaign_id, name, done) VALUES (?, ?, ?)", rows)
+
+                if row is not None:
+                    rebuild_summary(conn, previous | set(names))
+                    return
+                # 新活动一定排在每个人已有活动之后，直接在旧统计上累加即可
+                # UPDATE 里引用的都是旧值，所以 max_miss_streak 用的是更新前的 miss_streak
+                conn.executemany("""
+                    INSERT INTO student_summary (name, checks, done, miss_streak, max_miss_streak, last_campaign)
+                    VALUES (?1, 1, ?2, 1 - ?2, 1 - ?2, ?3)
+                    ON CONFLICT(name) DO UPDATE SET
+                        checks = checks + 1,
+                        done = done + ?2,
+                        miss_streak = CASE WHEN ?2 THEN 0 ELSE miss_streak + 1 END,
+                        max_miss_streak = MAX(max_miss_streak, CASE WHEN ?2 THEN 0 ELSE miss_streak + 1 END),
+                        last_campaign = ?3
+                """, [(n, done, campaign) for _, n, done in rows])
+        finally:
+            conn.close()
+
+    def student_stats(self):
+        """读取每人累计统计 (按活动计)，连续未完成次数多的排前面"""
+        conn = self.connect()
+        try:
+            rows = conn.execute("""
+                SELECT name, checks, done, miss_streak, max_miss_streak, last_campaign
+                FROM student_summary
+                ORDER BY miss_streak DESC, CAST(done AS REAL) / checks ASC, name
+            """).fetchall()
+        finally:
+            conn.close()
+        return [
+            {
+                "姓名": name,
+                "参与活动": checks,
+                "完成次数": done,
+                "完成率(%)": round(done / checks * 100, 1),
+                "当前连续未完成": miss_streak,
+                "最长连续未完成": max_miss_streak,
+                "最近活动": last_campaign,
+            }
+            for name, checks, done, miss_streak, max_miss_streak, last_campaign in rows
+        ]
+
+    def campaign_trend(self, limit=52):
+        """读取最近若干个活动的完成率 (同一活动取最后一次核查)，按活动先后返回"""
+        conn = self.connect()
+        try:
+            rows = conn.execute("""
+                SELECT campaign_id, campaign, scope, checked_at, total_n, done_n
+                FROM campaigns ORDER BY campaign_id DESC LIMIT ?
+            """, (limit,)).fetchall()
+        finally:
+            conn.close()
+        return [
+            {
+                "序号": campaign_id,
+                "活动": campaign,
+                "范围": scope,
+                "时间": checked_at,
+                "应到": total_n,
+                "实到": done_n,
+                "完成率(%)": round(done_n / total_n * 100, 1) if total_n else 0.0,
+            }
+            for campaign_id, campaign, scope, checked_at, total_n, done_n in reversed(rows)
+        ]
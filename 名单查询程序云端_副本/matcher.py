@@ -0,0 +1,20 @@
+"""
+名单匹配：不依赖 Streamlit，页面和进程池里的批量核查共用
+"""
+import re
+from itertools import compress
+
+NON_HAN_RE = re.compile(r'[^\u4e00-\u9fa5]')
+
+
+def turbo_hits(names, raw_text):
+    """极速匹配规则 (唯一的一份)：名字出现在原文或去掉符号后的文本里就算完成，按顺序逐个产出是否命中"""
+    clean_text = NON_HAN_RE.sub('', raw_text)
+    for name in names:
+        yield name in raw_text or name in clean_text
+
+
+def match_names_turbo(target_list, raw_text):
+    """极速匹配，返回已完成的名字集合"""
+    targets = list(target_list)
+    return set(compress(targets, turbo_hits(targets, raw_text)))
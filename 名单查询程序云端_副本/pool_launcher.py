@@ -0,0 +1,47 @@
+"""
+极速匹配进程池的启动器
+
+spawn 方式启动子进程时，会把 sys.modules["__main__"] 的 __file__ 当作主模块在子进程里重新执行。
+Streamlit 跑页面时 __main__ 就是 secretary.py，不处理的话每个子进程都会把整个页面再跑一遍
+(导入 streamlit、读名单、画侧边栏……)。这里在启动子进程的那一刻换成一个空的 __main__，
+子进程只会导入本模块和 batch_scheduler / matcher。
+"""
+import multiprocessing.context
+import os
+import sys
+import threading
+import types
+from concurrent.futures import ProcessPoolExecutor
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_MAIN_SWAP_LOCK = threading.Lock()
+_WORKER_MAIN = types.ModuleType("__main__")
+
+
+class _WorkerProcess(multiprocessing.context.SpawnProcess):
+    def start(self):
+        with _MAIN_SWAP_LOCK:
+            main = sys.modules["__main__"]
+            sys.modules["__main__"] = _WORKER_MAIN
+            try:
+                super().start()
+            finally:
+                sys.modules["__main__"] = main
+
+
+class _WorkerContext(multiprocessing.context.SpawnContext):
+    Process = _WorkerProcess
+
+
+def make_process_pool(max_workers=None):
+    """创建进程池，子进程不会重新执行页面脚本"""
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=_WorkerContext())
+
+
+def worker_app_modules():
+    """当前进程里已加载的本项目模块；提交到子进程里执行，用来确认它没有导入页面脚本"""
+    return sorted(
+        name for name, mod in list(sys.modules.items())
+        if getattr(mod, "__file__", None) and os.path.dirname(os.path.abspath(mod.__file__)) == APP_DIR
+    )
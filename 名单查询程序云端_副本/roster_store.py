@@ -0,0 +1,99 @@
+"""
+名单存储：class_roster.json 是唯一的真实数据，同目录下的二进制快照只是加速用的缓存
+
+- 进程内所有会话共用一个 RosterStore：文件没变时直接复用已加载的 CompactRoster，
+  变没变只看 (mtime_ns, size)，一次 stat
+- 保存时先写临时文件再原子替换；调用方要带上自己编辑时看到的版本 (stamp)，
+  文件在这期间被别人改过就拒绝保存，免得悄悄覆盖别人的修改
+"""
+import json
+import os
+import struct
+import tempfile
+import threading
+
+from compact_roster import CompactRoster
+
+EMPTY_ROSTER = CompactRoster.build((), ())
+
+
+class RosterChangedError(RuntimeError):
+    """保存时发现名单文件已被别人改过"""
+
+
+class RosterStore:
+    """一个名单 JSON + 它的二进制快照"""
+
+    def __init__(self, data_file, snapshot_file):
+        self.data_file = data_file
+        self.snapshot_file = snapshot_file
+        self.lock = threading.Lock()
+        self.stamp = None
+        self.data = EMPTY_ROSTER
+
+    def file_stamp(self):
+        """用 (mtime, size) 判断文件是否被改过，只需一次 stat"""
+        try:
+            stat = os.stat(self.data_file)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def load(self):
+        """读取共享名单；文件未变时直接复用缓存，不重复解析"""
+        stamp = self.file_stamp()
+        if stamp != self.stamp:
+            with self.lock:
+                if stamp != self.stamp:
+                    self.data = self._read(stamp) if stamp else EMPTY_ROSTER
+                    self.stamp = stamp
+        return self.data
+
+    def save(self, group_a, group_b, base_stamp):
+        """
+        base_stamp 是调用方开始编辑时名单的 stamp (roster.stamp)；
+        文件已经不是这个版本时抛 RosterChangedError，什么都不写。返回保存后的名单
+        """
+        data = {"group_a": list(group_a), "group_b": list(group_b)}
+        with self.lock:
+            current = self.file_stamp()
+            if current != (tuple(base_stamp) if base_stamp else None):
+                raise RosterChangedError("底册已被其他人修改，请先载入最新底册再保存")
+            fd, tmp_path = tempfile.mkstemp(prefix=".class_roster.", suffix=".tmp", dir=os.path.dirname(os.path.abspath(self.data_file)))
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.data_file)
+            except:
+                os.unlink(tmp_path)
+                raise
+            self.stamp = self.file_stamp()
+            self.data = CompactRoster.build(group_a, group_b, self.stamp)
+            self._write_snapshot(self.data)
+            return self.data
+
+    def _read(self, stamp):
+        """优先 mmap 打开与 JSON 同步的二进制快照；快照过期时解析 JSON 并重建快照"""
+        try:
+            roster = CompactRoster.open_snapshot(self.snapshot_file, stamp)
+        except (OSError, ValueError, struct.error):
+            roster = None
+        if roster is not None:
+            return roster
+        try:
+            with open(self.data_file, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+            roster = CompactRoster.build(raw.get("group_a", []), raw.get("group_b", []), stamp)
+        except:
+            return EMPTY_ROSTER
+        self._write_snapshot(roster)
+        return roster
+
+    def _write_snapshot(self, roster):
+        """快照只是加速用的缓存，写不进去 (如 Windows 上文件正被映射) 也不影响 JSON"""
+        try:
+            roster.save_snapshot(self.snapshot_file)
+        except OSError:
+            pass
@@ -1,37 +1,37 @@
 import streamlit as st
-import pandas as pd
+import importlib.util
 import json
 import os
 import re
+import threading
+from datetime import datetime
 
-# --- [改动1] 环境兼容：尝试导入本地 Ollama，失败则标记为 False ---
-try:
-    import ollama
-    HAS_LOCAL_OLLAMA = True
-except ImportError:
-    HAS_LOCAL_OLLAMA = False
+from batch_scheduler import run_jobs, split_names
+from history_store import HistoryStore
+from roster_store import RosterChangedError, RosterStore
 
-# --- [改动1] 引入 OpenAI 用于云端调用 ---
-from openai import OpenAI
+# --- [改动1] 环境兼容：只探测本地 Ollama 是否安装，不在启动时导入 ---
+HAS_LOCAL_OLLAMA = importlib.util.find_spec("ollama") is not None
 
-# ================= 0. 数据持久化核心函数 (保持不变) =================
+# --- [改动1] OpenAI / Ollama 都较重，推迟到第一次真正调用 AI 时再导入 ---
+# 冷启动耗时可用 startup_profile.py 查看
+
+# ================= 0. 数据持久化核心函数 (进程级共享缓存，见 roster_store) =================
 DATA_FILE = "class_roster.json"
+SNAPSHOT_FILE = "class_roster.bin"  # 紧凑二进制快照，mmap 只读打开，多进程共享
+
+@st.cache_resource
+def _roster_store():
+    """整个进程只建一次：所有会话共用同一份名单快照"""
+    return RosterStore(DATA_FILE, SNAPSHOT_FILE)
 
 def load_roster():
-    """启动时从文件读取名单"""
-    if os.path.exists(DATA_FILE):
-        try:
-            with open(DATA_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except:
-            return {"group_a": [], "group_b": []}
-    return {"group_a": [], "group_b": []}
-
-def save_roster(group_a, group_b):
-    """保存名单到文件"""
-    data = {"group_a": group_a, "group_b": group_b}
-    with open(DATA_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=4)
+    """读取共享名单；文件未变时直接复用缓存，不重复解析"""
+    return _roster_store().load()
+
+# ================= 0.1 核查历史库 (SQLite，见 history_store) =================
+HISTORY_FILE = "check_history.db"
+history = HistoryStore(HISTORY_FILE)
 
 # ================= 1. 页面配置与样式 (保持不变) =================
 st.set_page_config(
@@ -43,7 +43,7 @@ st.markdown('<div style="height: 5px; background: linear-gradient(90deg, #FF4B4B
 
 st.markdown(f"""
     <div style="display: flex; justify-content: space-between; align-items: center; padding: 10px 0;">
-        <span style="color: #666; font-size: 0.9em;">📅 当前日期：{pd.Timestamp.now().strftime('%Y-%m-%d')}</span>
+        <span style="color: #666; font-size: 0.9em;">📅 当前日期：{datetime.now().strftime('%Y-%m-%d')}</span>
         <span style="background-color: #ffe8e8; color: #ff4b4b; padding: 2px 10px; border-radius: 15px; font-size: 0.8em; font-weight: bold;">
             🚀 Designed By Dazzle With MacBook 
         </span>
@@ -58,9 +58,10 @@ st.markdown("""
     """, unsafe_allow_html=True)
 
 # ================= 2. 核心 AI 提取函数 (核心改动) =================
-def extract_names_ai(text, model_name):
+def extract_names_core(text, model_name, api_key):
     """
     智能路由：本地优先，失败自动降级到云端 API
+    不碰页面元素，可以在后台线程里跑；返回 (名字列表, 是否走了云端)，调用失败抛 RuntimeError
     """
     # 保持你认可的强力清洗 Prompt
     prompt = (
@@ -73,11 +74,13 @@ def extract_names_ai(text, model_name):
     )
     
     content = ""
+    used_cloud = False
     
     # --- 分支 A: 尝试本地 Ollama ---
     if HAS_LOCAL_OLLAMA and "Cloud" not in model_name:
         try:
             # 如果选的是云端选项，就不走这里；否则尝试本地
+            import ollama
             response = ollama.generate(model=model_name, prompt=prompt)
             content = response['response'].strip()
         except Exception:
@@ -85,12 +88,11 @@ def extract_names_ai(text, model_name):
 
     # --- 分支 B: 云端 DeepSeek API (当本地失败或无环境时) ---
     if not content:
-        api_key = st.secrets.get("DEEPSEEK_API_KEY") # 从 Streamlit 后台读取
         if not api_key:
-            st.error("⚠️ 未检测到本地 Ollama，且未配置云端 API Key！")
-            return []
+            raise RuntimeError("⚠️ 未检测到本地 Ollama，且未配置云端 API Key！")
             
         try:
+            from openai import OpenAI
             client = OpenAI(api_key=api_key, base_url="https://api.deepseek.com")
             response = client.chat.completions.create(
                 model="deepseek-chat",
@@ -98,10 +100,9 @@ def extract_names_ai(text, model_name):
                 stream=False
             )
             content = response.choices[0].message.content.strip()
-            st.toast("☁️ 已切换至云端 DeepSeek 引擎") # 提示一下用户
+            used_cloud = True
         except Exception as e:
-            st.error(f"云端调用失败: {e}")
-            return []
+            raise RuntimeError(f"云端调用失败: {e}")
 
     # --- 通用清洗逻辑 (保持不变) ---
     try:
@@ -116,45 +117,123 @@ def extract_names_ai(text, model_name):
             pure_name = re.sub(r'[^\u4e00-\u9fa5]', '', n)
             if len(pure_name) >= 2:
                 cleaned_names.append(pure_name)
-        return list(set(cleaned_names))
-    except:
+        return list(set(cleaned_names)), used_cloud
+    except Exception as e:
+        raise RuntimeError(f"AI 返回内容无法解析: {e}")
+
+def extract_names_ai(text, model_name):
+    """页面里的单次提取：错误和引擎切换直接提示给用户；提取失败返回 None (区别于"一个名字都没有")"""
+    try:
+        names, used_cloud = extract_names_core(text, model_name, st.secrets.get("DEEPSEEK_API_KEY")) # 从 Streamlit 后台读取
+    except RuntimeError as e:
+        st.error(str(e))
+        return None
+    if used_cloud:
+        st.toast("☁️ 已切换至云端 DeepSeek 引擎") # 提示一下用户
+    return names
+
+@st.cache_data(ttl=300, show_spinner=False)
+def list_local_models():
+    """列出本地 Ollama 模型，结果缓存 5 分钟，避免每次重跑都去请求本地服务"""
+    try:
+        import ollama
+        models_info = ollama.list()
+        return [m['name'] for m in (models_info['models'] if 'models' in models_info else models_info)]
+    except Exception:
         return []
 
-# ================= 3. 数据初始化 (保持不变) =================
-if "group_a" not in st.session_state or "group_b" not in st.session_state:
-    saved_data = load_roster()
-    st.session_state.group_a = saved_data.get("group_a", [])
-    st.session_state.group_b = saved_data.get("group_b", [])
+# ================= 2.1 结果展示 =================
+def show_result(roster, target_bits, done_bits):
+    """四维指标 + 待冲锋/已完成名单，手动核查和自动拉取共用；名单都是位图，展示时才解码名字"""
+    done_bits &= target_bits
+    missing = sorted(roster.names_of(target_bits & ~done_bits))
+    valid_done = sorted(roster.names_of(done_bits))
+
+    st.divider()
+    m1, m2, m3, m4 = st.columns(4)
+    total_n, done_n, miss_n = roster.count(target_bits), len(valid_done), len(missing)
+    percent = (done_n / total_n * 100) if total_n > 0 else 0
+
+    m1.metric("应到人数", f"{total_n}人")
+    m2.metric("实到人数", f"{done_n}人", delta=f"{done_n - total_n}", delta_color="inverse")
+    m3.metric("待冲锋", f"{miss_n}人", delta=f"{miss_n}", delta_color="off")
+    m4.metric("完成率", f"{percent:.1f}%")
+    st.progress(percent / 100)
+
+    st.markdown("### 📋 核查详情")
+    with st.container(border=True):
+        res_col1, res_col2 = st.columns(2)
+        with res_col1:
+            st.markdown(f"#### <span style='color: #ff4b4b;'>🚩 待冲锋 ({miss_n})</span>", unsafe_allow_html=True)
+            if missing:
+                missing_html = "".join([
+                    f'<div style="display:inline-block; background-color:#fff5f5; color:#ff4b4b; border:1px solid #ffcccc; padding:4px 10px; border-radius:5px; margin:3px; font-size:14px;">{name}</div>' 
+                    for name in missing
+                ])
+                st.markdown(missing_html, unsafe_allow_html=True)
+                st.divider()
+                st.markdown("**📢 快速群通知：**")
+                st.code(f"未完成提醒：@{' @'.join(missing)}", language="text")
+            else:
+                st.success("🎉 功德圆满，全员已完成！")
+
+        with res_col2:
+            st.markdown(f"#### <span style='color: #28a745;'>✅ 已完成名单 ({done_n})</span>", unsafe_allow_html=True)
+            if valid_done:
+                done_tags = " ".join([f'<span style="background-color:#e1f5fe; color:#01579b; padding:2px 8px; border-radius:10px; margin:2px; display:inline-block;">{n}</span>' for n in valid_done])
+                st.markdown(done_tags, unsafe_allow_html=True)
+            else:
+                st.info("暂无匹配数据")
+
+# ================= 2.2 多班批量核查的共享资源 =================
+MODEL_SLOTS = 2  # 整个服务同时在跑的模型请求上限，所有会话共用
+
+@st.cache_resource
+def _process_pool():
+    """极速匹配用的进程池，整个服务只建一个，子进程复用；用到时才导入 (子进程不会重跑本页面，见 pool_launcher)"""
+    from pool_launcher import make_process_pool
+    return make_process_pool(os.cpu_count())
+
+@st.cache_resource
+def _model_slots():
+    """全局模型槽位"""
+    return threading.BoundedSemaphore(MODEL_SLOTS)
+
+def _new_poller(url):
+    """导出链接轮询器；urllib.request 会连带导入 http.client / ssl，所以用到时才导入"""
+    from export_poller import ExportPoller
+    return ExportPoller(url)
+
+# ================= 3. 数据初始化 (共享缓存) =================
+# 名单不再拷贝进 session_state：每次重跑都从进程级缓存取只读快照，
+# 其他会话保存后，本会话下一次重跑即可看到
+roster = load_roster()
 
 # ================= 4. 侧边栏 (轻微改动以适应云端) =================
 with st.sidebar:
     st.title("🌈 考勤看板")
     
     # --- [改动3] 模型选择加了容错 ---
-    try:
-        if HAS_LOCAL_OLLAMA:
-            models_info = ollama.list()
-            model_list = [m['name'] for m in (models_info['models'] if 'models' in models_info else models_info)]
-            # 自动找 qwen3
-            default_index = 0
-            for i, name in enumerate(model_list):
-                if "qwen3" in name.lower():
-                    default_index = i
-                    break
-            selected_model = st.selectbox("🧠 选择 AI 大脑:", model_list, index=default_index)
-        else:
-            # 云端环境直接显示这个，不报错
-            selected_model = st.selectbox("🧠 选择 AI 大脑:", ["☁️ DeepSeek V3 (Cloud)"])
-    except:
+    model_list = list_local_models() if HAS_LOCAL_OLLAMA else []
+    if model_list:
+        # 自动找 qwen3
+        default_index = 0
+        for i, name in enumerate(model_list):
+            if "qwen3" in name.lower():
+                default_index = i
+                break
+        selected_model = st.selectbox("🧠 选择 AI 大脑:", model_list, index=default_index)
+    else:
+        # 云端环境直接显示这个，不报错
         selected_model = st.selectbox("🧠 选择 AI 大脑:", ["☁️ DeepSeek V3 (Cloud)"])
     
     st.divider()
-    count_a = len(st.session_state.group_a)
-    count_b = len(st.session_state.group_b)
+    count_a = roster.count(roster.group_a)
+    count_b = roster.count(roster.group_b & ~roster.group_a)
     st.subheader("📊 班级基数")
     st.write(f"团员总数:**{count_a}**人")
     st.write(f"群众总数:**{count_b}** 人")
-    st.write(f"全班总计:**{count_a + count_b}** 人")
+    st.write(f"全班总计:**{roster.count(roster.all_bits)}** 人")
     
     st.divider()
     st.subheader("⌨️ 技术栈说明")
@@ -171,16 +250,16 @@ with st.sidebar:
     with st.expander("🧼 自动化清洗 (Clean)"):
         st.markdown("- 底册去重\n- 冲突自动修正")
     with st.expander("📊 实时看板 (Dashboard)"):
-        st.markdown("- 四维指标计算\n- 一键生成催办名单")
+        st.markdown("- 四维指标计算\n- 一键生成催办名单\n- 历史记录与连续未完成追踪")
 
 # ================= 5. 主界面布局 (保持不变) =================
 st.title("🛡️ 团支部智能核查系统")
 
-tab_check, tab_config = st.tabs(["🚀 智能核查", "⚙️ 底册管理"])
+tab_check, tab_poll, tab_batch, tab_history, tab_config = st.tabs(["🚀 智能核查", "🔗 自动拉取", "📚 多班核查", "📈 历史统计", "⚙️ 底册管理"])
 
 # --- Tab 1: 智能核查 (保持极速模式逻辑) ---
 with tab_check:
-    if not st.session_state.group_a and not st.session_state.group_b:
+    if not roster.all_bits:
         st.warning("⚠️ 请先切换到『底册管理』录入班级名单！")
     else:
         c1, c2 = st.columns([1, 1])
@@ -190,8 +269,13 @@ with tab_check:
             st.write("")
             use_turbo = st.toggle("⚡ 极速匹配模式", value=True, help="关闭 AI，使用纯算法匹配")
         
-        target_list = st.session_state.group_a if "仅" in mode else (st.session_state.group_a + st.session_state.group_b)
+        target_bits = roster.group_a if "仅" in mode else roster.all_bits
         
+        # 不再默认填日期：同一天的不同活动会被合并成一个
+        campaign = st.text_input(
+            "🏷️ 本次活动名称（写入历史）：", placeholder=f"例如：{datetime.now():%Y-%m-%d} 青年大学习",
+            help="同名活动、同一范围再次核查会覆盖上次结果，不会重复计数；不填则不写入历史",
+        ).strip()
         raw_text = st.text_area("📥 粘贴完成情况（乱序文本/截图识字）：", height=180, placeholder="例如：1.张三 2.李四 已完成...")
         
         btn_label = "⚡ 立即秒杀" if use_turbo else "🔍 开始 AI 深度核查"
@@ -203,69 +287,185 @@ with tab_check:
                 if use_turbo:
                     # 极速模式
                     with st.spinner("⚡ 正在执行 O(N) 极速检索..."):
-                        clean_text = re.sub(r'[^\u4e00-\u9fa5]', '', raw_text)
-                        valid_done = []
-                        for name in target_list:
-                            if name in raw_text or name in clean_text:
-                                valid_done.append(name)
-                        valid_done = set(valid_done)
-                        extracted_names = list(valid_done)
+                        done_bits = roster.match_turbo(target_bits, raw_text)
                 else:
                     # AI 模式
                     with st.spinner(f"正在驱动 AI 深度解析..."):
                         extracted_names = extract_names_ai(raw_text, selected_model)
-                        valid_done = set(target_list) & set(extracted_names)
+                        # 提取失败时不出结果也不写历史，免得把全员记成未完成
+                        done_bits = None if extracted_names is None else roster.mask(extracted_names) & target_bits
 
                 # --- 结果展示 (保持不变) ---
-                base_set = set(target_list)
-                missing = sorted(list(base_set - valid_done))
-                
-                st.divider()
-                m1, m2, m3, m4 = st.columns(4)
-                total_n, done_n, miss_n = len(target_list), len(valid_done), len(missing)
-                percent = (done_n / total_n * 100) if total_n > 0 else 0
-                
-                m1.metric("应到人数", f"{total_n}人")
-                m2.metric("实到人数", f"{done_n}人", delta=f"{done_n - total_n}", delta_color="inverse")
-                m3.metric("待冲锋", f"{miss_n}人", delta=f"{miss_n}", delta_color="off")
-                m4.metric("完成率", f"{percent:.1f}%")
-                st.progress(percent / 100)
-
-                st.markdown("### 📋 核查详情")
-                with st.container(border=True):
-                    res_col1, res_col2 = st.columns(2)
-                    with res_col1:
-                        st.markdown(f"#### <span style='color: #ff4b4b;'>🚩 待冲锋 ({miss_n})</span>", unsafe_allow_html=True)
-                        if missing:
-                            missing_html = "".join([
-                                f'<div style="display:inline-block; background-color:#fff5f5; color:#ff4b4b; border:1px solid #ffcccc; padding:4px 10px; border-radius:5px; margin:3px; font-size:14px;">{name}</div>' 
-                                for name in missing
-                            ])
-                            st.markdown(missing_html, unsafe_allow_html=True)
-                            st.divider()
-                            st.markdown("**📢 快速群通知：**")
-                            st.code(f"未完成提醒：@{' @'.join(missing)}", language="text")
-                        else:
-                            st.success("🎉 功德圆满，全员已完成！")
-
-                    with res_col2:
-                        st.markdown(f"#### <span style='color: #28a745;'>✅ 已完成名单 ({done_n})</span>", unsafe_allow_html=True)
-                        if valid_done:
-                            done_tags = " ".join([f'<span style="background-color:#e1f5fe; color:#01579b; padding:2px 8px; border-radius:10px; margin:2px; display:inline-block;">{n}</span>' for n in sorted(list(valid_done))])
-                            st.markdown(done_tags, unsafe_allow_html=True)
-                        else:
-                            st.info("暂无匹配数据")
-
-# --- Tab 2: 底册管理 (保持不变) ---
+                if done_bits is not None:
+                    if campaign:
+                        history.append(campaign, mode, roster.names_of(target_bits), set(roster.names_of(done_bits)))
+                    else:
+                        st.info("未填写活动名称，本次结果没有写入历史统计。")
+                    show_result(roster, target_bits, done_bits)
+
+# --- Tab 2: 自动拉取 (轮询导出链接，只处理新增行) ---
+with tab_poll:
+    if not roster.all_bits:
+        st.warning("⚠️ 请先切换到『底册管理』录入班级名单！")
+    else:
+        export_url = st.text_input("🔗 接龙/表单导出链接（CSV 或纯文本）：", placeholder="https://.../export.csv").strip()
+        p1, p2, p3 = st.columns([2, 1, 1])
+        with p1:
+            poll_mode = st.radio("核查范围：", ["仅核查团员", "全班核查"], horizontal=True, key="poll_mode")
+        with p2:
+            poll_interval = st.number_input("拉取间隔（秒）", min_value=10, value=60, step=10)
+        with p3:
+            st.write("")
+            auto_poll = st.toggle("🔄 定时拉取", value=False)
+
+        poll_campaign = st.text_input("🏷️ 活动名称（记入历史时使用）：", placeholder="例如：第 3 期青年大学习", key="poll_campaign").strip()
+        poll_bits = roster.group_a if "仅" in poll_mode else roster.all_bits
+
+        # 链接、范围或底册变了就从头开始
+        poll_key = (export_url, poll_mode, roster.stamp)
+        if st.session_state.get("poll_key") != poll_key:
+            st.session_state.poll_key = poll_key
+            st.session_state.poller = _new_poller(export_url) if export_url else None
+            st.session_state.poll_done = 0
+
+        @st.fragment(run_every=poll_interval if auto_poll and export_url else None)
+        def poll_panel():
+            poller = st.session_state.poller
+            if poller is None:
+                st.info("填写导出链接后即可拉取。")
+                return
+
+            # 整页重跑时主脚本会先放一个标记；没有标记说明是片段自己重跑：
+            # 要么是点了片段里的按钮，要么是 run_every 定时到了。只在定时到了或点"立即拉取"时请求链接
+            full_run = st.session_state.pop("poll_full_run", False)
+            c_pull, c_save = st.columns(2)
+            pull_now = c_pull.button("⬇️ 立即拉取")
+            save_now = c_save.button("📝 记入历史")
+            timer_tick = auto_poll and not full_run and not save_now
+            if pull_now or timer_tick:
+                try:
+                    new_rows = poller.poll()
+                except Exception as e:
+                    st.error(f"拉取失败: {e}")
+                    new_rows = []
+                if new_rows:
+                    # 只拿新增行去匹配还没完成的人
+                    pending = poll_bits & ~st.session_state.poll_done
+                    st.session_state.poll_done |= roster.match_turbo(pending, "\n".join(new_rows))
+                st.session_state.poll_status = f"{datetime.now():%H:%M:%S} 新增 {len(new_rows)} 行"
+
+            if save_now and not poll_campaign:
+                st.warning("请先填写活动名称再记入历史。")
+            elif save_now:
+                history.append(
+                    poll_campaign, poll_mode,
+                    roster.names_of(poll_bits), set(roster.names_of(st.session_state.poll_done)),
+                )
+                st.toast("已写入历史统计")
+
+            st.caption(
+                f"已拉取 {poller.polls} 次（未变化 {poller.not_modified} 次），"
+                f"最近一次：{st.session_state.get('poll_status', '—')}"
+            )
+            show_result(roster, poll_bits, st.session_state.poll_done)
+
+        st.session_state.poll_full_run = True
+        poll_panel()
+
+# --- Tab 3: 多班核查 (进程池跑极速匹配，AI 受全局槽位限制) ---
+with tab_batch:
+    st.caption("每行一个班：名单用空格、顿号或换行分隔，完成情况直接粘贴。结果按完成先后陆续出现在看板里。")
+    if "batch_jobs" not in st.session_state:
+        st.session_state.batch_jobs = [{"班级": "本班", "名单": "、".join(roster.names_of(roster.all_bits)), "完成情况": "", "AI解析": False}]
+    batch_rows = st.data_editor(
+        st.session_state.batch_jobs,
+        num_rows="dynamic",
+        use_container_width=True,
+        key="batch_editor",
+        column_config={
+            "名单": st.column_config.TextColumn(width="large"),
+            "完成情况": st.column_config.TextColumn(width="large"),
+            "AI解析": st.column_config.CheckboxColumn(default=False),
+        },
+    )
+
+    if st.button("🚀 开始批量核查"):
+        jobs = []
+        for i, row in enumerate(batch_rows):
+            targets = split_names(row.get("名单"))
+            if targets:
+                jobs.append({
+                    "name": row.get("班级") or f"第 {i + 1} 组",
+                    "targets": targets,
+                    "text": row.get("完成情况") or "",
+                    "use_ai": bool(row.get("AI解析")),
+                })
+
+        if not jobs:
+            st.warning("请至少填写一个班级的名单！")
+        else:
+            api_key = st.secrets.get("DEEPSEEK_API_KEY") if any(j["use_ai"] for j in jobs) else None
+            ai_extract = lambda text: extract_names_core(text, selected_model, api_key)[0]
+
+            progress = st.progress(0.0)
+            totals = st.empty()
+            board = st.empty()
+            board_rows = []
+            total_all = done_all = 0
+            # 子进程崩溃后旧进程池不能再用，清掉缓存让下次核查重建
+            results = run_jobs(jobs, _process_pool(), ai_extract, _model_slots(),
+                               ai_workers=MODEL_SLOTS, on_pool_broken=_process_pool.clear)
+            for result in results:
+                total_n, done_n = len(result["targets"]), len(result["done"])
+                total_all += total_n
+                done_all += done_n
+                board_rows.append({
+                    "班级": result["name"],
+                    "应到": total_n,
+                    "实到": done_n,
+                    "完成率(%)": round(done_n / total_n * 100, 1),
+                    "待冲锋": "、".join(sorted(set(result["targets"]) - result["done"])),
+                    "耗时(秒)": round(result["elapsed"], 3),
+                    "状态": f"❌ {result['error']}" if result["error"] else "✅",
+                })
+                progress.progress(len(board_rows) / len(jobs))
+                with totals.container():
+                    t1, t2, t3 = st.columns(3)
+                    t1.metric("已完成班级", f"{len(board_rows)}/{len(jobs)}")
+                    t2.metric("合计实到", f"{done_all}/{total_all}人")
+                    t3.metric("合计完成率", f"{done_all / total_all * 100:.1f}%")
+                board.dataframe(board_rows, use_container_width=True, hide_index=True)
+
+# --- Tab 4: 历史统计 (读取增量维护的汇总表) ---
+with tab_history:
+    trend = history.campaign_trend()
+    if not trend:
+        st.info("暂无历史记录，完成一次核查后会自动记录。")
+    else:
+        st.markdown("### 📉 各活动完成率趋势")
+        st.line_chart(trend, x="序号", y="完成率(%)")
+        st.dataframe(trend, use_container_width=True, hide_index=True)
+
+        st.markdown("### 🧑‍🎓 个人完成情况")
+        stats = history.student_stats()
+        stragglers = [row["姓名"] for row in stats if row["当前连续未完成"] >= 2]
+        if stragglers:
+            st.markdown(f"**⚠️ 连续两个及以上活动未完成：** {'、'.join(stragglers)}")
+        st.dataframe(stats, use_container_width=True, hide_index=True)
+
+# --- Tab 5: 底册管理 (保持不变) ---
 with tab_config:
     st.subheader("📝 录入/更新班级底册")
+    # 记下编辑框第一次显示时的底册版本，保存时用它判断期间有没有别人改过
+    if "edit_a" not in st.session_state:
+        st.session_state.edit_base = roster.stamp
     col_a, col_b = st.columns(2)
     with col_a:
         st.markdown("### 🔴 团员名单")
-        input_a = st.text_area("每行一个名字", value="\n".join(st.session_state.group_a), height=300, key="edit_a")
+        input_a = st.text_area("每行一个名字", value="\n".join(roster.names_of(roster.group_a)), height=300, key="edit_a")
     with col_b:
         st.markdown("### 🔵 群众名单")
-        input_b = st.text_area("每行一个名字", value="\n".join(st.session_state.group_b), height=300, key="edit_b")
+        input_b = st.text_area("每行一个名字", value="\n".join(roster.names_of(roster.group_b & ~roster.group_a)), height=300, key="edit_b")
     
     if st.button("🚀 保存并自动清洗底册数据"):
         clean_a = list(dict.fromkeys([n.strip() for n in input_a.split("\n") if n.strip()]))
@@ -273,10 +473,18 @@ with tab_config:
         set_a = set(clean_a)
         clean_b = [name for name in raw_b if name not in set_a]
         
-        st.session_state.group_a = clean_a
-        st.session_state.group_b = clean_b
-        save_roster(clean_a, clean_b) 
-        st.success("✅ 数据已保存！")
+        try:
+            saved = _roster_store().save(clean_a, clean_b, st.session_state.edit_base)
+        except RosterChangedError as e:
+            st.error(f"❌ {e}。你这次的修改没有保存，可先复制下来。")
+        else:
+            st.session_state.edit_base = saved.stamp
+            st.success("✅ 数据已保存！")
+            st.rerun()
+
+    if st.session_state.edit_base != roster.stamp and st.button("🔄 放弃我的修改，载入最新底册"):
+        for key in ("edit_a", "edit_b", "edit_base"):
+            st.session_state.pop(key, None)
         st.rerun()
 
 # ================= 6. 页脚 (保持不变) =================
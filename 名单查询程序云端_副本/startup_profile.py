@@ -0,0 +1,139 @@
+"""
+冷启动分析：统计 secretary.py 顶层导入的耗时，并做回归检查
+
+用法：
+    python startup_profile.py                 # 打印导入耗时明细
+    python startup_profile.py --budget 2000   # 顶层导入超过 2000ms 时以非零状态退出
+
+每次测量都在全新的 Python 子进程里用 -X importtime 完成，取多次运行中的最小值。
+"""
+import argparse
+import ast
+import os
+import subprocess
+import sys
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_FILE = os.path.join(APP_DIR, "secretary.py")
+
+# 这些模块只能在第一次用到时导入，出现在顶层就算回归
+DEFERRED_MODULES = ["pandas", "openai", "ollama", "export_poller"]
+
+
+class _TopLevelImports(ast.NodeVisitor):
+    """收集脚本每次运行都会执行的 import（跳过函数体）"""
+
+    def __init__(self):
+        self.modules = []
+
+    def visit_Import(self, node):
+        self.modules.extend(alias.name for alias in node.names)
+
+    def visit_ImportFrom(self, node):
+        if node.module and not node.level:
+            self.modules.append(node.module)
+
+    def visit_FunctionDef(self, node):
+        pass
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+    visit_Lambda = visit_FunctionDef
+
+
+def top_level_imports(path=APP_FILE):
+    """解析脚本，返回顶层导入的模块名（去重、保持顺序）"""
+    with open(path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+    visitor = _TopLevelImports()
+    visitor.visit(tree)
+    return list(dict.fromkeys(visitor.modules))
+
+
+def measure_imports(modules, runs=3):
+    """
+    在新子进程里导入 modules，返回 ({模块: 累计耗时(ms)}, {导入失败的模块: 错误信息})
+    耗时取多次运行中的最小值
+    """
+    # 子进程逐个汇报导入结果："ok\t模块" 或 "fail\t模块\t错误"
+    code = "".join(
+        f"try:\n    import {m}\n    print('ok\\t' + {m!r})\n"
+        f"except Exception as e:\n    print('fail\\t' + {m!r} + '\\t' + type(e).__name__ + ': ' + str(e))\n"
+        for m in modules
+    )
+    best, errors = {}, {}
+    for _ in range(runs):
+        # 在脚本所在目录运行，这样和 streamlit run 一样能导入同目录下的本地模块
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            capture_output=True, text=True, cwd=APP_DIR,
+        )
+        timings = {}
+        for line in proc.stderr.splitlines():
+            # 格式：import time:   self [us] | cumulative | imported package
+            if not line.startswith("import time:") or "|" not in line:
+                continue
+            _, cumulative, name = line[len("import time:"):].split("|")
+            if name.startswith("  ") or not cumulative.strip().isdigit():
+                continue  # 只看最外层模块，子模块已计入 cumulative
+            timings[name.strip()] = int(cumulative) / 1000
+        for line in proc.stdout.splitlines():
+            status, _, rest = line.partition("\t")
+            name, _, error = rest.partition("\t")
+            if status == "fail":
+                errors[name] = error
+                continue
+            # 解释器启动时或被前面的模块加载过的模块 (如 os、sys) 不会再出现在 importtime 里，记为 0
+            root = name.split(".")[0]
+            ms = timings.get(name, timings.get(root, 0.0))
+            best[name] = min(best.get(name, ms), ms)
+        if proc.returncode != 0:
+            errors.setdefault("<子进程>", proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"退出码 {proc.returncode}")
+    for name in modules:
+        if name not in best and name not in errors:
+            errors[name] = "没有导入结果"
+    return best, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="secretary.py 冷启动导入耗时分析")
+    parser.add_argument("--runs", type=int, default=3, help="重复测量次数，取最小值")
+    parser.add_argument("--budget", type=float, default=None, help="顶层导入总耗时上限 (ms)")
+    args = parser.parse_args()
+
+    modules = top_level_imports()
+    timings, errors = measure_imports(modules, args.runs)
+    total = sum(timings.values())
+
+    # 导入结果缓存在 sys.modules 里，之后的重跑不会再付出这部分时间
+    print("=== 顶层导入耗时 (仅冷启动时付出一次) ===")
+    for name, ms in sorted(timings.items(), key=lambda kv: kv[1], reverse=True):
+        print(f"{ms:10.1f} ms  {name}")
+    print(f"{total:10.1f} ms  合计")
+
+    deferred, _ = measure_imports(DEFERRED_MODULES, args.runs)
+    print("\n=== 延迟导入模块 (仅首次调用时付出) ===")
+    for name in DEFERRED_MODULES:
+        ms = deferred.get(name)
+        print(f"{ms:10.1f} ms  {name}" if ms is not None else f"{'未安装':>13}  {name}")
+
+    failed = False
+    if errors:
+        # 导入不了的模块测不出耗时，合计会偏小，不能当作通过
+        print("\n❌ 顶层模块导入失败，耗时未计入合计：")
+        for name, error in errors.items():
+            print(f"    {name}: {error}")
+        failed = True
+    leaked = [m for m in modules if m.split(".")[0] in DEFERRED_MODULES]
+    if leaked:
+        print(f"\n❌ 回归：这些模块应当延迟导入，却出现在顶层：{', '.join(leaked)}")
+        failed = True
+    if args.budget is not None and total > args.budget:
+        print(f"\n❌ 回归：顶层导入 {total:.1f} ms 超出预算 {args.budget:.1f} ms")
+        failed = True
+    if not failed:
+        print("\n✅ 冷启动检查通过")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import os
+import sys
+import threading
+import time
+import types
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch_scheduler import run_jobs, split_names
+from pool_launcher import make_process_pool, worker_app_modules
+
+
+def test_split_names():
+    assert split_names("张三、李四 王五\n张三，赵六") == ("张三", "李四", "王五", "赵六")
+    assert split_names(None) == ()
+
+
+def test_workers_do_not_rerun_page_script(tmp_path, monkeypatch):
+    # 模拟 Streamlit：页面运行时 __main__ 是一个 __file__ 指向页面脚本的假模块
+    marker = tmp_path / "ran.txt"
+    script = tmp_path / "fake_page.py"
+    script.write_text(f"open({str(marker)!r}, 'w').write(__name__)\n", encoding="utf-8")
+    fake_main = types.ModuleType("__main__")
+    fake_main.__file__ = str(script)
+    monkeypatch.setitem(sys.modules, "__main__", fake_main)
+
+    pool = make_process_pool(1)
+    try:
+        jobs = [
+            {"name": "1班", "targets": ("张三", "李四", "王五"), "text": "1.张三 2.王 五", "use_ai": False},
+            {"name": "2班", "targets": ("赵六", "钱七"), "text": "赵六 钱七", "use_ai": True},
+        ]
+        results = {r["name"]: r for r in run_jobs(jobs, pool, lambda text: ["赵六"], threading.BoundedSemaphore(1))}
+        loaded = pool.submit(worker_app_modules).result()
+    finally:
+        pool.shutdown()
+
+    assert sys.modules["__main__"] is fake_main
+    assert results["1班"]["done"] == {"张三", "王五"} and results["1班"]["error"] is None
+    assert results["2班"]["done"] == {"赵六"}
+    assert not marker.exists()
+    assert set(loaded) <= {"batch_scheduler", "matcher", "pool_launcher"}
+
+
+def test_broken_pool_is_reported_per_job():
+    pool = make_process_pool(1)
+    cleared = []
+    try:
+        # 模拟子进程崩溃：进程池随之失效
+        with pytest.raises(BrokenProcessPool):
+            pool.submit(os._exit, 1).result()
+        jobs = [
+            {"name": f"{i}班", "targets": ("张三",), "text": "张三", "use_ai": False}
+            for i in range(3)
+        ] + [{"name": "AI班", "targets": ("李四",), "text": "李四", "use_ai": True}]
+        results = {r["name"]: r for r in run_jobs(jobs, pool, lambda text: ["李四"], threading.BoundedSemaphore(1),
+                                                  on_pool_broken=lambda: cleared.append(1))}
+    finally:
+        pool.shutdown()
+
+    assert cleared == [1]
+    assert all("进程池异常退出" in results[f"{i}班"]["error"] for i in range(3))
+    assert results["AI班"]["done"] == {"李四"} and results["AI班"]["error"] is None
+
+
+def test_model_slots_cap_concurrent_ai_calls():
+    slots = 2
+    lock = threading.Lock()
+    active, peak, calls = 0, 0, 0
+
+    def fake_extract(text):
+        nonlocal active, peak, calls
+        with lock:
+            active += 1
+            calls += 1
+            peak = max(peak, active)
+        time.sleep(0.02)
+        with lock:
+            active -= 1
+        return text.split()
+
+    # 两批同时在跑 (模拟两个会话)，各自的线程池都比槽位大，仍共用同一个全局槽位
+    model_slots = threading.BoundedSemaphore(slots)
+    jobs = [{"name": f"{i}班", "targets": ("张三",), "text": "张三", "use_ai": True} for i in range(8)]
+    batches = [[], []]
+
+    def run_batch(out):
+        out.extend(run_jobs(jobs, None, fake_extract, model_slots, ai_workers=6))
+
+    threads = [threading.Thread(target=run_batch, args=(out,)) for out in batches]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert calls == 16
+    assert all(r["done"] == {"张三"} and r["error"] is None for out in batches for r in out)
+    assert peak <= slots
+    assert peak == slots  # 槽位被用满，说明请求确实在并发，上面的上限检查才有意义
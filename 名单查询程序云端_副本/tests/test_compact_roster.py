@@ -0,0 +1,62 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compact_roster import CompactRoster
+from matcher import match_names_turbo
+
+
+def test_bits_and_ids():
+    roster = CompactRoster.build(["张三", "李四", "王五"], ["李四", "赵六"])
+    assert roster.size == 4
+    assert list(roster.ids(roster.group_a)) == [0, 1, 2]
+    assert roster.names_of(roster.group_b) == ["李四", "赵六"]
+    assert roster.count(roster.all_bits) == 4
+    assert roster.mask(["赵六", "张三", "路人"]) == 0b1001
+    assert list(roster.ids(0)) == []
+
+
+def test_match_turbo_checks_only_given_bits():
+    roster = CompactRoster.build(["张三", "李四", "王五"], ["赵六"])
+    done = roster.match_turbo(roster.group_a, "1.张 三 2.王五 赵六")
+    assert roster.names_of(done) == ["张三", "王五"]
+
+
+def test_match_turbo_agrees_with_matcher():
+    names = ["张三", "李四", "王五", "欧阳娜娜", "赵六"]
+    roster = CompactRoster.build(names, [])
+    text = "1. 张 三 ✅\n2.欧阳娜娜\n李四未交"
+    assert set(roster.names_of(roster.match_turbo(roster.all_bits, text))) == match_names_turbo(names, text)
+
+
+def test_find_uses_sorted_ids(tmp_path):
+    names = ["赵六", "张三", "Amy", "张三丰", "李四", "张"]
+    roster = CompactRoster.build(names[:3], names[3:])
+    path = str(tmp_path / "roster.bin")
+    roster.save_snapshot(path)
+    for r in (roster, CompactRoster.open_snapshot(path)):
+        assert [r.find(n) for n in names] == list(range(len(names)))
+        assert r.find("张三四") is None and r.find("") is None and r.find("zz") is None
+        assert r.mask(["张三丰", "路人", "张"]) == (1 << 3) | (1 << 5)
+
+
+def test_large_roster_ids_roundtrip():
+    names = [f"学生{i}" for i in range(50000)]
+    roster = CompactRoster.build(names, names[::2])
+    assert roster.group_a == (1 << 50000) - 1
+    assert list(roster.ids(roster.group_b)) == list(range(0, 50000, 2))
+    assert roster.names_of(roster.group_a & ~roster.group_b) == names[1::2]
+    assert roster.mask(names[::3]) == sum(1 << i for i in range(0, 50000, 3))
+
+
+def test_snapshot_roundtrip(tmp_path):
+    path = str(tmp_path / "roster.bin")
+    roster = CompactRoster.build(["张三", "李四"], ["王五"], stamp=(123, 45))
+    roster.save_snapshot(path)
+
+    loaded = CompactRoster.open_snapshot(path, stamp=(123, 45))
+    assert loaded.names_of(loaded.group_a) == ["张三", "李四"]
+    assert loaded.names_of(loaded.group_b) == ["王五"]
+    assert loaded.mask(["王五"]) == roster.mask(["王五"])
+    assert CompactRoster.open_snapshot(path, stamp=(124, 45)) is None
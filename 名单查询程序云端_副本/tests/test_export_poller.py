@@ -0,0 +1,70 @@
+import hashlib
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from export_poller import ExportPoller, split_rows
+
+
+class _ExportHandler(BaseHTTPRequestHandler):
+    """模拟导出链接：带 ETag，If-None-Match 命中时回 304"""
+
+    def do_GET(self):
+        body = self.server.body
+        etag = '"%s"' % hashlib.md5(body).hexdigest()
+        self.server.requests.append(dict(self.headers))
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/csv; charset=utf-8")
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _ExportHandler)
+    httpd.body = b""
+    httpd.requests = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield httpd
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+def test_split_rows():
+    assert split_rows('姓名,备注\n张三,"已读\n已回复"\n\n , \n') == ["姓名 备注", "张三 已读\n已回复"]
+
+
+def test_poll_strips_bom_and_uses_etag(server):
+    server.body = "\ufeff1,张三\n2,李四\n".encode("utf-8")
+    poller = ExportPoller(f"http://127.0.0.1:{server.server_port}/export.csv")
+
+    assert poller.poll() == ["1 张三", "2 李四"]
+    assert poller.etag and "If-None-Match" not in server.requests[0]
+
+    # 内容没变：服务器回 304，不返回任何行
+    assert poller.poll() == []
+    assert poller.not_modified == 1
+    assert server.requests[1]["If-None-Match"] == poller.etag
+
+    # 追加一行：只返回新出现的那一行
+    server.body += "3,王五\n".encode("utf-8")
+    assert poller.poll() == ["3 王五"]
+    assert poller.polls == 3 and poller.not_modified == 1
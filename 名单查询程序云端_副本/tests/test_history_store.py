@@ -0,0 +1,112 @@
+import os
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from history_store import HistoryStore, rebuild_summary
+
+CLASS = ["张三", "李四", "王五", "赵六"]
+CHECKS = [
+    ("第1次", CLASS, {"张三", "李四"}),
+    ("第2次", CLASS, {"张三"}),
+    ("第3次", CLASS[:3], {"李四"}),        # 赵六不在这次范围里
+    ("第4次", CLASS, {"张三", "赵六"}),
+    ("第5次", ["李四", "钱七"], set()),
+]
+
+
+def _summary(store):
+    conn = store.connect()
+    try:
+        return conn.execute("SELECT * FROM student_summary ORDER BY name").fetchall()
+    finally:
+        conn.close()
+
+
+def _rebuilt(store):
+    """把所有人按记录重新累计一遍，得到重建路径的统计"""
+    conn = store.connect()
+    try:
+        with conn:
+            names = [n for (n,) in conn.execute("SELECT DISTINCT name FROM campaign_records")]
+            rebuild_summary(conn, names)
+        return conn.execute("SELECT * FROM student_summary ORDER BY name").fetchall()
+    finally:
+        conn.close()
+
+
+def _store(tmp_path, name, checks):
+    store = HistoryStore(str(tmp_path / name))
+    for campaign, targets, done in checks:
+        store.append(campaign, "全班", targets, done)
+    return store
+
+
+def test_incremental_matches_rebuild(tmp_path):
+    store = _store(tmp_path, "a.db", CHECKS)
+    incremental = _summary(store)
+    assert incremental == _rebuilt(store)
+
+    stats = {row["姓名"]: row for row in store.student_stats()}
+    assert stats["王五"]["当前连续未完成"] == 4 and stats["王五"]["最长连续未完成"] == 4
+    assert stats["李四"]["参与活动"] == 5 and stats["李四"]["完成次数"] == 2
+    assert stats["李四"]["当前连续未完成"] == 2 and stats["李四"]["最长连续未完成"] == 2
+    assert stats["赵六"]["参与活动"] == 3 and stats["赵六"]["最近活动"] == "第4次"
+
+
+def test_recheck_earlier_campaign_overwrites(tmp_path):
+    store = _store(tmp_path, "a.db", CHECKS)
+    # 重新核查第 2 次：范围缩小、结果也变了
+    store.append("第2次", "全班", ["张三", "李四", "钱七"], {"李四", "钱七"})
+
+    # 等价于一开始就按新结果记录的库 (全程走增量路径)
+    fresh = [CHECKS[0], ("第2次", ["张三", "李四", "钱七"], {"李四", "钱七"}), *CHECKS[2:]]
+    expected = _store(tmp_path, "b.db", fresh)
+    assert _summary(store) == _summary(expected)
+    assert _summary(store) == _rebuilt(store)
+
+    trend = store.campaign_trend()
+    assert [t["活动"] for t in trend] == ["第1次", "第2次", "第3次", "第4次", "第5次"]
+    assert (trend[1]["应到"], trend[1]["实到"]) == (3, 2)
+
+
+def test_recheck_same_result_does_not_double_count(tmp_path):
+    store = _store(tmp_path, "a.db", CHECKS[:2])
+    before = _summary(store)
+    store.append("第2次", "全班", CLASS, {"张三"})
+    assert _summary(store) == before
+    assert len(store.campaign_trend()) == 2
+
+
+def test_scope_is_part_of_the_campaign_key(tmp_path):
+    store = HistoryStore(str(tmp_path / "a.db"))
+    store.append("青年大学习", "全班核查", CLASS, {"张三", "赵六"})
+    # 同名活动只核查团员：不能删掉群众 (赵六) 在全班核查里的记录
+    store.append("青年大学习", "仅核查团员", CLASS[:3], {"张三"})
+
+    trend = store.campaign_trend()
+    assert [(t["活动"], t["范围"], t["应到"], t["实到"]) for t in trend] == [
+        ("青年大学习", "全班核查", 4, 2), ("青年大学习", "仅核查团员", 3, 1),
+    ]
+    stats = {row["姓名"]: row for row in store.student_stats()}
+    assert (stats["赵六"]["参与活动"], stats["赵六"]["完成次数"]) == (1, 1)
+    assert stats["张三"]["参与活动"] == 2
+
+
+def test_old_database_is_migrated(tmp_path):
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE campaigns (
+            campaign_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            campaign TEXT NOT NULL UNIQUE, scope TEXT NOT NULL, checked_at TEXT NOT NULL,
+            total_n INTEGER NOT NULL, done_n INTEGER NOT NULL
+        );
+        INSERT INTO campaigns (campaign, scope, checked_at, total_n, done_n) VALUES ('旧活动', '全班核查', '2026-01-01 00:00:00', 4, 1);
+    """)
+    conn.close()
+
+    store = HistoryStore(path)
+    store.append("旧活动", "仅核查团员", CLASS[:3], {"张三"})
+    assert [(t["序号"], t["范围"]) for t in store.campaign_trend()] == [(1, "全班核查"), (2, "仅核查团员")]
@@ -0,0 +1,88 @@
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import roster_store
+from roster_store import EMPTY_ROSTER, RosterChangedError, RosterStore
+
+
+def _store(tmp_path):
+    return RosterStore(str(tmp_path / "class_roster.json"), str(tmp_path / "class_roster.bin"))
+
+
+def _write_json(path, group_a, group_b):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"group_a": group_a, "group_b": group_b}, f, ensure_ascii=False)
+
+
+def test_missing_file_is_empty(tmp_path):
+    assert _store(tmp_path).load() is EMPTY_ROSTER
+
+
+def test_reload_only_when_file_changes(tmp_path):
+    store = _store(tmp_path)
+    _write_json(store.data_file, ["张三"], ["李四"])
+    first = store.load()
+    assert first.names_of(first.all_bits) == ["张三", "李四"]
+    assert store.load() is first
+
+    # 别的进程直接改了 JSON：stamp 变了就重新加载
+    _write_json(store.data_file, ["张三", "王五"], ["李四"])
+    os.utime(store.data_file, ns=(1, 1))
+    second = store.load()
+    assert second is not first
+    assert second.names_of(second.group_a) == ["张三", "王五"]
+    assert second.stamp == (1, os.path.getsize(store.data_file))
+
+
+def test_snapshot_is_reused_by_a_new_process(tmp_path):
+    store = _store(tmp_path)
+    store.save(["张三"], ["李四"], None)
+    assert os.path.exists(store.snapshot_file)
+
+    # 新进程里的 store：快照和 JSON 对得上，直接 mmap 打开，不再解析 JSON
+    fresh = _store(tmp_path)
+    roster = fresh.load()
+    assert isinstance(roster._blob, memoryview)
+    assert roster.names_of(roster.all_bits) == ["张三", "李四"]
+
+
+def test_save_is_atomic(tmp_path, monkeypatch):
+    store = _store(tmp_path)
+    base = store.save(["张三"], [], None).stamp
+
+    def broken_dump(*args, **kwargs):
+        raise OSError("磁盘已满")
+
+    monkeypatch.setattr(roster_store.json, "dump", broken_dump)
+    with pytest.raises(OSError):
+        store.save(["李四"], [], base)
+    monkeypatch.undo()
+
+    # 原文件不变，临时文件被清理，内存里的名单也没动
+    with open(store.data_file, encoding="utf-8") as f:
+        assert json.load(f)["group_a"] == ["张三"]
+    assert sorted(os.listdir(tmp_path)) == ["class_roster.bin", "class_roster.json"]
+    assert store.load().names_of(store.load().all_bits) == ["张三"]
+
+
+def test_save_refuses_stale_base(tmp_path):
+    store = _store(tmp_path)
+    base = store.save(["张三"], [], None).stamp
+
+    # 会话 B 基于同一版本先保存
+    newer = store.save(["张三", "李四"], [], base)
+    # 会话 A 还拿着旧版本：拒绝保存，不覆盖 B 的修改
+    with pytest.raises(RosterChangedError):
+        store.save(["王五"], [], base)
+    with pytest.raises(RosterChangedError):
+        store.save(["王五"], [], None)
+    assert store.load() is newer
+    assert newer.names_of(newer.group_a) == ["张三", "李四"]
+
+    store.save(["王五"], [], newer.stamp)
+    assert store.load().names_of(store.load().group_a) == ["王五"]
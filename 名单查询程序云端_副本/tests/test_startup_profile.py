@@ -0,0 +1,31 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from startup_profile import DEFERRED_MODULES, top_level_imports
+
+
+def test_heavy_modules_stay_out_of_top_level_imports():
+    modules = top_level_imports()
+    assert "streamlit" in modules  # 确认确实解析到了 secretary.py 的顶层导入
+    leaked = [m for m in modules if m.split(".")[0] in DEFERRED_MODULES]
+    assert leaked == []
+
+
+def test_imports_inside_functions_are_not_top_level(tmp_path):
+    script = tmp_path / "page.py"
+    script.write_text(
+        "import json\n"
+        "from os import path\n"
+        "if json:\n"
+        "    import csv\n"
+        "def f():\n"
+        "    import ollama\n"
+        "g = lambda: __import__('openai')\n"
+        "class C:\n"
+        "    def m(self):\n"
+        "        from pandas import DataFrame\n",
+        encoding="utf-8",
+    )
+    assert top_level_imports(str(script)) == ["json", "os", "csv"]
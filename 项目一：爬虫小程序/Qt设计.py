@@ -3,16 +3,72 @@ import os
 import requests
 import json
 from PyQt6.QtWidgets import QApplication, QMainWindow, QMessageBox
+from PyQt6.QtCore import QThread, pyqtSignal
 from PyQt6 import uic
 
+from extractor import StreamExtractor, RecordWriter, Selector, parse_fields, consume_chunks
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# 打包成 .exe / .app 后 BASE_DIR 是程序包或临时解压目录，结果文件放到用户主目录
+OUTPUT_DIR = os.path.expanduser("~")
+
+
+class CrawlWorker(QThread):
+    """后台线程：流式下载响应，一边收数据一边提取，界面不会卡住"""
+    progress = pyqtSignal(str)
+    done = pyqtSignal(str)
+
+    PREVIEW_LIMIT = 10000   # 日志里只显示前 10000 字
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, url, method, payload, row_selector=None, fields=None, output_path=""):
+        super().__init__()
+        self.url = url
+        self.method = method
+        self.payload = payload
+        self.row_selector = row_selector
+        self.fields = fields
+        self.output_path = output_path
+
+    def run(self):
+        try:
+            headers = {"User-Agent": "Mozilla/5.0"}
+            if self.method == "post":
+                response = requests.post(self.url, headers=headers, json=self.payload, timeout=5, stream=True)
+            else:
+                response = requests.get(self.url, headers=headers, timeout=5, stream=True)
+
+            with response:
+                if self.row_selector:
+                    with RecordWriter(self.output_path, [name for name, _, _ in self.fields]) as writer:
+                        parser = StreamExtractor(self.row_selector, self.fields, writer.write)
+                        preview = self._consume(response, parser)
+                    summary = f"📦 共提取 {parser.count} 条记录 -> {self.output_path}\n"
+                else:
+                    preview = self._consume(response, None)
+                    summary = ""
+
+            self.done.emit(f"✅ 成功响应[{self.method}] 状态码: {response.status_code}\n{summary}\n{preview}...")
+        except Exception as e:
+            self.done.emit(f"😭 请求失败:\n{str(e)}")
+
+    def _consume(self, response, parser):
+        """逐块读取响应，预览和解析交给 consume_chunks，每解析一块汇报一次进度"""
+        def report(received):
+            self.progress.emit(f"⏳ 已接收 {received // 1024} KB，已提取 {parser.count} 条...")
+
+        chunks = response.iter_content(chunk_size=self.CHUNK_SIZE)
+        return consume_chunks(chunks, parser, self.PREVIEW_LIMIT, report)
+
+
 class MySpider(QMainWindow):
     def __init__(self):
         super().__init__()
+        self.worker = None
         
         # 1. 动态获取 UI 文件路径
-        base_dir = os.path.dirname(os.path.abspath(__file__))
         # 注意：这里的文件名必须和你保存的一模一样
-        ui_file_path = os.path.join(base_dir, "爬虫ui设计.ui") 
+        ui_file_path = os.path.join(BASE_DIR, "爬虫ui设计.ui") 
 
         # 2. 加载界面
         try:
@@ -48,39 +104,42 @@ class MySpider(QMainWindow):
             QMessageBox.warning(self, "提醒", "网址不能为空！")
             return
 
+        payload = {}
+        if method == "post" and raw_data:
+            # 处理 JSON 数据
+            try:
+                payload = json.loads(raw_data)
+            except:
+                self.textEdit.setText("❌ JSON 格式错误！请检查你的参数。")
+                return
+
+        # 5. 提取规则 (行选择器留空则只预览)
+        row_text = self.row_selector.text().strip()
+        row_selector, fields, output_path = None, None, ""
+        if row_text:
+            try:
+                row_selector = Selector(row_text)
+                fields = parse_fields(self.field_selectors.text())
+            except ValueError as e:
+                QMessageBox.warning(self, "提醒", f"提取规则有误：{e}")
+                return
+            # 相对路径也按用户主目录算，不依赖启动时的工作目录
+            output_path = os.path.join(OUTPUT_DIR, os.path.expanduser(self.output_path.text().strip() or "results.jsonl"))
+
         # --- 界面反馈 ---
         # 界面里的大白板叫 textEdit
         self.textEdit.setText(f"🚀 正在发起 {method} 请求: {url} ...")
-        QApplication.processEvents() # 强制刷新
+        self.pushButton.setEnabled(False)
 
-        # --- 爬虫逻辑 ---
-        try:
-            headers = {"User-Agent": "Mozilla/5.0"}
-            response = None
-
-            if method == "get":
-                response = requests.get(url, headers=headers, timeout=5)
-            
-            elif method == "post":
-                # 处理 JSON 数据
-                payload = {}
-                if raw_data:
-                    try:
-                        payload = json.loads(raw_data)
-                    except:
-                        self.textEdit.setText("❌ JSON 格式错误！请检查你的参数。")
-                        return
-                response = requests.post(url, headers=headers, json=payload, timeout=5)
-
-            # --- 显示结果 ---
-            response.encoding = 'utf-8'
-            preview = response.text[:10000] # 只显示前10000字
-            
-            msg = f"✅ 成功响应[{method}] 状态码: {response.status_code}\n\n{preview}..."
-            self.textEdit.setText(msg)
+        # --- 爬虫逻辑放到后台线程 ---
+        self.worker = CrawlWorker(url, method, payload, row_selector, fields, output_path)
+        self.worker.progress.connect(self.textEdit.setText)
+        self.worker.done.connect(self.on_crawl_done)
+        self.worker.start()
 
-        except Exception as e:
-            self.textEdit.setText(f"😭 请求失败:\n{str(e)}")
+    def on_crawl_done(self, msg):
+        self.textEdit.setText(msg)
+        self.pushButton.setEnabled(True)
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
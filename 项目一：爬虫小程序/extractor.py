@@ -0,0 +1,292 @@
+"""
+流式 HTML 提取：边下载边解析，按选择器逐条产出记录
+
+内存里只保留「当前打开的标签栈」和「正在提取的那一条记录」，
+所以再大的列表页也是常量内存。
+
+选择器是 CSS 的一个子集：
+    tag / * / .class / #id / [attr] / [attr=value]，可组合成 li.item#top[data-id]
+    用空格表示后代关系，如 div.list li；用 > 表示直接子元素，如 ul > li
+    不支持的写法 (如 :first-child、[href^=http]) 会直接报错，不会悄悄忽略
+字段写法：名字=选择器，多个字段用分号隔开，末尾可加
+    ::text         取元素文本 (默认)
+    ::attr(href)   取属性值
+选择器留空表示行元素本身，如 id=::attr(data-id)
+例：行选择器 li.item，字段 title=h2::text; url=a::attr(href)
+"""
+import codecs
+import csv
+import json
+import re
+from html.parser import HTMLParser
+
+# 没有结束标签的元素，不入栈
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+# 可以省略结束标签的元素：遇到同名新标签时视为上一个已结束
+AUTO_CLOSE_TAGS = {"li", "p", "tr", "td", "th", "dt", "dd", "option"}
+# 自动闭合不能越过这些容器
+SCOPE_TAGS = {"ul", "ol", "dl", "table", "tbody", "thead", "select", "div"}
+# 内容是代码而不是文字的元素，::text 不收它们的内容
+NON_TEXT_TAGS = {"script", "style", "template", "noscript"}
+
+_COMPOUND_RE = re.compile(r"\*|[#.]?[\w-]+|\[[^\]]+\]")
+_ATTR_NAME_RE = re.compile(r"[\w-]+")
+
+
+def _parse_compound(text):
+    """把 li.item#top[data-id=3] 解析成 (tag, classes, id, attrs)；有认不出的部分就报 ValueError"""
+    tag, classes, elem_id, attrs = None, set(), None, []
+    pos = 0
+    while pos < len(text):
+        m = _COMPOUND_RE.match(text, pos)
+        if not m:
+            raise ValueError(f"不支持的选择器写法：{text}（无法识别 {text[pos:]!r}）")
+        part, pos = m.group(), m.end()
+        if part.startswith("."):
+            classes.add(part[1:])
+        elif part.startswith("#"):
+            elem_id = part[1:]
+        elif part.startswith("["):
+            key, sep, value = part[1:-1].partition("=")
+            key = key.strip()
+            if not _ATTR_NAME_RE.fullmatch(key):
+                raise ValueError(f"不支持的属性选择器：{part}（只支持 [attr] 和 [attr=value]）")
+            attrs.append((key, value.strip().strip("\"'") if sep else None))
+        elif tag is not None or classes or elem_id or attrs:
+            raise ValueError(f"不支持的选择器写法：{text}（标签名必须写在最前面）")
+        else:
+            tag = part.lower()
+    return tag, classes, elem_id, attrs
+
+
+def _match_compound(compound, tag, attrs):
+    want_tag, classes, elem_id, want_attrs = compound
+    if want_tag and want_tag != "*" and want_tag != tag:
+        return False
+    if classes and not classes <= set((attrs.get("class") or "").split()):
+        return False
+    if elem_id and attrs.get("id") != elem_id:
+        return False
+    for key, value in want_attrs:
+        if key not in attrs or (value is not None and attrs[key] != value):
+            return False
+    return True
+
+
+class Selector:
+    """一条 CSS 子集选择器，支持后代 (空格) 和直接子元素 (>) 两种关系"""
+
+    def __init__(self, text):
+        self.text = text.strip()
+        self.parts = []        # [(compound, 与前一段的关系 " " 或 ">")]
+        combinator = " "
+        for token in self.text.replace(">", " > ").split():
+            if token == ">":
+                if not self.parts or combinator == ">":
+                    raise ValueError(f"选择器里的 > 两边都要有元素：{self.text}")
+                combinator = ">"
+                continue
+            self.parts.append((_parse_compound(token), combinator))
+            combinator = " "
+        if combinator == ">":
+            raise ValueError(f"选择器里的 > 两边都要有元素：{self.text}")
+        if not self.parts:
+            raise ValueError("选择器不能为空")
+
+    def matches(self, path):
+        """path 是从祖先到当前元素的 [(tag, attrs), ...]，最后一项是当前元素"""
+        return bool(path) and self._match_at(len(self.parts) - 1, path, len(path) - 1)
+
+    def _match_at(self, i, path, j):
+        """第 i 段能否落在 path[j] 上，且前面各段都能在它的祖先里依次找到"""
+        compound, combinator = self.parts[i]
+        if not _match_compound(compound, *path[j]):
+            return False
+        if i == 0:
+            return True
+        if combinator == ">":
+            return j > 0 and self._match_at(i - 1, path, j - 1)
+        return any(self._match_at(i - 1, path, k) for k in range(j - 1, -1, -1))
+
+
+def parse_fields(text):
+    """把 "title=h2::text; url=a::attr(href)" 解析成 [(名字, Selector, 属性名或 None)]"""
+    fields = []
+    for item in text.split(";"):
+        if not item.strip():
+            continue
+        name, sep, expr = item.partition("=")
+        if not sep:
+            raise ValueError(f"字段格式应为 名字=选择器：{item.strip()}")
+        attr = None
+        expr, _, pseudo = expr.partition("::")
+        pseudo = pseudo.strip()
+        if pseudo.startswith("attr(") and pseudo.endswith(")"):
+            attr = pseudo[5:-1].strip()
+        elif pseudo not in ("", "text"):
+            raise ValueError(f"不支持的伪元素 ::{pseudo}")
+        fields.append((name.strip(), Selector(expr) if expr.strip() else None, attr))
+    if not fields:
+        raise ValueError("至少需要一个字段")
+    return fields
+
+
+class StreamExtractor(HTMLParser):
+    """
+    增量解析器：feed() 每收到一块数据就解析一块，
+    每当一个行元素闭合就调用 on_record(dict)
+    """
+
+    def __init__(self, row_selector, fields, on_record):
+        super().__init__(convert_charrefs=True)
+        self.row_selector = Selector(row_selector) if isinstance(row_selector, str) else row_selector
+        self.fields = parse_fields(fields) if isinstance(fields, str) else fields
+        self.field_names = [name for name, _, _ in self.fields]
+        self.on_record = on_record
+        self.count = 0
+        self._stack = []        # [(tag, attrs)]
+        self._row_depth = None  # 当前行元素在栈中的深度
+        self._values = {}
+        self._texts = {}        # 字段名 -> (元素深度, 文本片段列表)
+        self._non_text = 0      # 栈里还开着几个 NON_TEXT_TAGS
+
+    # ---------- HTMLParser 回调 ----------
+    def handle_starttag(self, tag, attrs):
+        if tag in AUTO_CLOSE_TAGS:
+            self._auto_close(tag)
+        attrs = {k: (v or "") for k, v in attrs}
+        self._stack.append((tag, attrs))
+        if tag in NON_TEXT_TAGS:
+            self._non_text += 1
+        depth = len(self._stack)
+
+        if self._row_depth is None:
+            if self.row_selector.matches(self._stack):
+                self._row_depth = depth
+                self._values, self._texts = {}, {}
+                for name, selector, attr in self.fields:
+                    if selector is None:
+                        self._capture(name, attr, depth, attrs)
+        else:
+            # 字段选择器相对于行元素匹配，只看行内的路径
+            inner = self._stack[self._row_depth:]
+            for name, selector, attr in self.fields:
+                if selector is None or name in self._values or name in self._texts:
+                    continue
+                if selector.matches(inner):
+                    self._capture(name, attr, depth, attrs)
+
+        if tag in VOID_TAGS:
+            self._pop_to(depth - 1)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self._pop_to(len(self._stack) - 1)
+
+    def handle_endtag(self, tag):
+        for i in range(len(self._stack) - 1, -1, -1):
+            if self._stack[i][0] == tag:
+                self._pop_to(i)
+                return
+        # 找不到对应开始标签的结束标签直接忽略
+
+    def handle_data(self, data):
+        if self._non_text:
+            return
+        for _, parts in self._texts.values():
+            parts.append(data)
+
+    def close(self):
+        super().close()
+        self._pop_to(0)
+
+    # ---------- 内部 ----------
+    def _capture(self, name, attr, depth, attrs):
+        if attr is None:
+            self._texts[name] = (depth, [])
+        else:
+            self._values[name] = attrs.get(attr, "")
+
+    def _auto_close(self, tag):
+        for i in range(len(self._stack) - 1, -1, -1):
+            open_tag = self._stack[i][0]
+            if open_tag == tag:
+                self._pop_to(i)
+                return
+            if open_tag in SCOPE_TAGS:
+                return
+
+    def _pop_to(self, depth):
+        """把栈弹到只剩 depth 层，顺带收尾闭合的字段和行"""
+        while len(self._stack) > depth:
+            closing = len(self._stack)
+            for name, (field_depth, parts) in list(self._texts.items()):
+                if field_depth == closing:
+                    self._values[name] = " ".join("".join(parts).split())
+                    del self._texts[name]
+            if closing == self._row_depth:
+                self._emit()
+            if self._stack.pop()[0] in NON_TEXT_TAGS:
+                self._non_text -= 1
+
+    def _emit(self):
+        record = {name: self._values.get(name, "") for name in self.field_names}
+        self._row_depth, self._values, self._texts = None, {}, {}
+        self.count += 1
+        self.on_record(record)
+
+
+class RecordWriter:
+    """逐条写出记录：.csv 结尾写 CSV，其余写 JSONL"""
+
+    def __init__(self, path, field_names):
+        self.path = path
+        self._file = open(path, "w", encoding="utf-8", newline="")
+        self._csv = None
+        if path.lower().endswith(".csv"):
+            self._csv = csv.DictWriter(self._file, fieldnames=field_names)
+            self._csv.writeheader()
+
+    def write(self, record):
+        if self._csv:
+            self._csv.writerow(record)
+        else:
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def consume_chunks(chunks, parser=None, preview_limit=10000, on_chunk=None, encoding="utf-8"):
+    """
+    把字节块流逐块解码：截取前 preview_limit 字作为预览，并把每块喂给 parser
+    - 跨块被切开的多字节字符由增量解码器拼好，不会变成乱码
+    - 没有 parser 时读够预览就停止，不再继续下载
+    - 每喂完一块调用 on_chunk(已接收字节数)
+    返回预览文本
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    preview, received = "", 0
+    for chunk in chunks:
+        received += len(chunk)
+        text = decoder.decode(chunk)
+        if len(preview) < preview_limit:
+            preview += text[:preview_limit - len(preview)]
+        if parser is None:
+            if len(preview) >= preview_limit:
+                break
+            continue
+        parser.feed(text)
+        if on_chunk:
+            on_chunk(received)
+    if parser is not None:
+        parser.feed(decoder.decode(b"", final=True))
+        parser.close()
+    return preview
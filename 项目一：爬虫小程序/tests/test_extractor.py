@@ -0,0 +1,116 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extractor import Selector, StreamExtractor, consume_chunks, parse_fields
+
+
+def _extract(html, row_selector, fields, chunk_size=None):
+    records = []
+    parser = StreamExtractor(row_selector, fields, records.append)
+    data = html.encode("utf-8")
+    size = chunk_size or len(data) or 1
+    consume_chunks([data[i:i + size] for i in range(0, len(data), size)], parser)
+    return records
+
+
+def test_selector_descendant_and_compound():
+    li = ("li", {"class": "item top", "data-id": "3"})
+    assert Selector("li.item[data-id=3]").matches([li])
+    assert Selector("div.list li").matches([("div", {"class": "list"}), ("ul", {}), li])
+    assert not Selector("div.list li").matches([("div", {"class": "other"}), li])
+    assert not Selector("li#top").matches([li])
+    with pytest.raises(ValueError):
+        Selector("  ")
+
+
+def test_child_combinator():
+    html = "<ul><li>a<ol><li>b</li></ol></li></ul>"
+    assert _extract(html, "ul > li", "t=::text") == [{"t": "ab"}]
+    assert _extract(html, "ul>li", "t=::text") == [{"t": "ab"}]
+    assert _extract(html, "ol > li", "t=::text") == [{"t": "b"}]
+    assert _extract("<div><p><span>x</span></p></div>", "div > span", "t=::text") == []
+    assert _extract("<div><p><span>x</span></p></div>", "div > * > span", "t=::text") == [{"t": "x"}]
+    # 字段选择器相对于行元素
+    html = "<li><a href='/1'>x</a><p><a href='/2'>y</a></p></li>"
+    assert _extract(html, "li", "u=p > a::attr(href)") == [{"u": "/2"}]
+
+
+@pytest.mark.parametrize("text", ["li:first-child", "a[href^=http]", "li::before", "> li", "ul >", "ul > > li", "[x]li"])
+def test_unsupported_selectors_are_rejected(text):
+    with pytest.raises(ValueError):
+        Selector(text)
+
+
+def test_parse_fields():
+    fields = parse_fields("title=h2::text; url=a::attr(href); id=::attr(data-id)")
+    assert [(name, attr) for name, _, attr in fields] == [("title", None), ("url", "href"), ("id", "data-id")]
+    assert fields[2][1] is None
+    with pytest.raises(ValueError):
+        parse_fields("title=h2::html")
+
+
+def test_tiny_chunks_give_same_records():
+    html = (
+        '<div class="list"><ul>'
+        '<li class="item" data-id="1"><h2> 第一 条 </h2><a href="/a">链接</a></li>'
+        '<li class="item" data-id="2"><h2>第二条</h2><img src="x.png"><a href="/b">链接</a></li>'
+        '</ul></div>'
+    )
+    fields = "id=::attr(data-id); title=h2::text; url=a::attr(href)"
+    expected = [
+        {"id": "1", "title": "第一 条", "url": "/a"},
+        {"id": "2", "title": "第二条", "url": "/b"},
+    ]
+    assert _extract(html, "div.list li.item", fields) == expected
+    for size in (1, 2, 3, 7):
+        assert _extract(html, "div.list li.item", fields, chunk_size=size) == expected
+
+
+def test_unclosed_li_and_td():
+    html = "<ul><li>张三<li>李四<li>王五</ul><p>尾巴"
+    assert _extract(html, "li", "name=::text") == [{"name": "张三"}, {"name": "李四"}, {"name": "王五"}]
+
+    html = "<table><tr><td>1<td>张三<tr><td>2<td>李四</table>"
+    assert _extract(html, "tr", "cell=td::text") == [{"cell": "1"}, {"cell": "2"}]
+
+
+def test_script_and_style_are_not_text():
+    html = "<li>a<script>var x = '<b>1</b>';</script><style>li{color:red}</style>b</li><li>c<noscript>开启 JS</noscript></li>"
+    assert _extract(html, "li", "t=::text") == [{"t": "ab"}, {"t": "c"}]
+    assert _extract(html, "li", "t=::text", chunk_size=3) == [{"t": "ab"}, {"t": "c"}]
+
+
+def test_split_utf8_bytes_across_chunks():
+    data = "<p>张三</p><p>李四</p>".encode("utf-8")
+    # 每块 1 字节，汉字的 3 个字节全被拆开
+    records = []
+    parser = StreamExtractor("p", "name=::text", records.append)
+    preview = consume_chunks([data[i:i + 1] for i in range(len(data))], parser)
+    assert records == [{"name": "张三"}, {"name": "李四"}]
+    assert preview == data.decode("utf-8")
+    assert "�" not in preview
+
+
+def test_preview_only_stops_early():
+    pulled = []
+
+    def chunks():
+        for i in range(100):
+            pulled.append(i)
+            yield "汉字".encode("utf-8") * 10
+
+    preview = consume_chunks(chunks(), preview_limit=50)
+    assert len(preview) == 50
+    assert len(pulled) == 3
+
+
+def test_on_chunk_reports_received_bytes():
+    received = []
+    parser = StreamExtractor("li", "name=::text", lambda record: None)
+    consume_chunks([b"<li>a", b"</li>", b"<li>b</li>"], parser, on_chunk=received.append)
+    assert received == [5, 10, 20]
+    assert parser.count == 2